@@ -1,9 +1,12 @@
-from time import sleep
+from time import sleep, perf_counter
 import streamlit as st
 from entanglement import entangle, reset_circuit
 from teleportation import teleportation, initialize_state
 from coin_game import coin_game
 from correlation import correlation
+from prerender import get_pack
+from fragments import record_timing, show_timings, timings_requested
+from figure_pool import release_pool, show_figure_stats
 
 st.set_page_config(
     page_title="Quantum Playground",
@@ -12,6 +15,11 @@ st.set_page_config(
     initial_sidebar_state='expanded',
 )
 
+page_start = perf_counter()
+
+# Map the prerendered pack once per server so the first visitors hit warm data.
+get_pack()
+
 if "mode" not in st.session_state:
     st.session_state.mode = None
 
@@ -52,10 +60,19 @@ with st.sidebar:
     if st.session_state.mode is not None:
         if st.button("⬅️ Back to Home Page", use_container_width=True, type='secondary'):
             st.toast("✨ Returning to Home Page...")
+            release_pool()
             st.session_state.clear()
             sleep(1)
             st.rerun()
 
+    # Append ?timings=1 to the URL: each demo block then captions its own rerun time, and the sidebar
+    # shows the page total, live figures and memory use.
+    if timings_requested():
+        with st.expander("⏱️ Rerun timings"):
+            show_timings()
+        with st.expander("🖼️ Live figures"):
+            show_figure_stats()
+
 # 🌠 MAIN AREA
 if st.session_state.mode is None:
     st.markdown(
@@ -139,3 +156,5 @@ st.markdown(
         </p>
         """, unsafe_allow_html=True
     )
+
+record_timing("page", perf_counter() - page_start)
@@ -3,20 +3,12 @@ from matplotlib import pyplot as plt
 from qiskit.quantum_info import Statevector
 from qiskit_aer import Aer
 from qiskit import QuantumCircuit
-from qiskit.visualization import plot_histogram, plot_bloch_multivector
+from prerender import get_pack
+from fragments import timed_fragment
+from figure_pool import get_pool
 
 
-def correlation():
-
-    st.title("🔗 Quantum Correlation Explorer")
-
-    st.markdown('In this experiment, we explore how two entangled qubits remain correlated '
-                'even when measured in different bases.')
-
-    # st.markdown('---')
-    basis = st.selectbox("`Choose Measurement Basis:`", ["Z", "X", "Y"])
-    bell_state = st.selectbox("`Choose Bell State:`", ["Φ⁺", "Φ⁻", "Ψ⁺", "Ψ⁻"])
-
+def correlation_circuit(bell_state, basis):
     qc = QuantumCircuit(2, 2)
 
     # Prepare Bell state
@@ -31,8 +23,6 @@ def correlation():
         qc.z(1)
     qc.barrier()
 
-
-
     if basis == "X":
         qc.h(0)
         qc.h(1)
@@ -43,12 +33,46 @@ def correlation():
         qc.h(1)
 
     qc.barrier()
+    return qc
+
+
+def basis_circuit(basis):
+    qc1 = QuantumCircuit(2, 2)
+    qc1.x(1)
+    if 'X' in basis:
+        qc1.h([0, 1])
+    elif 'Y' in basis:
+        qc1.h([0, 1])
+        qc1.s([0, 1])
+    return qc1
+
+
+def correlation():
+
+    st.title("🔗 Quantum Correlation Explorer")
+
+    st.markdown('In this experiment, we explore how two entangled qubits remain correlated '
+                'even when measured in different bases.')
+
+    explorer()
+
+
+@timed_fragment("correlation explorer")
+def explorer():
+    # Every view below depends on both selections, so they rerun together.
+    # st.markdown('---')
+    basis = st.selectbox("`Choose Measurement Basis:`", ["Z", "X", "Y"])
+    bell_state = st.selectbox("`Choose Bell State:`", ["Φ⁺", "Φ⁻", "Ψ⁺", "Ψ⁻"])
+
+    qc = correlation_circuit(bell_state, basis)
 
     st.markdown(f"""
             ### 🧬 Bell State `|{bell_state}⟩` prepared in `{basis}` basis
             """)
 
-    state = Statevector.from_instruction(qc)
+    pack = get_pack()
+    key = f"correlation/{bell_state}/{basis}"
+    state = pack.statevector(key) if pack and key in pack else Statevector.from_instruction(qc)
     bas_z = ["|00⟩", "|01⟩", "|10⟩", "|11⟩"]
     bas_y = ["|y+y+⟩", "|y+y-⟩", "|y-y+⟩", "|y-y-⟩"]
     bas_x = ["|x+x+⟩", "|x+x-⟩", "|x-x+⟩", "|x-x-⟩"]
@@ -68,34 +92,27 @@ def correlation():
 
 
     expander1 = st.expander("See Circuit")
-    fig = qc.draw(output='mpl', style={'fontsize': 10, 'linecolor': '#555'}, scale=0.5)
-    expander1.pyplot(fig, width="content")
-    plt.close(fig)
+    if pack and key in pack:
+        expander1.image(pack.figure(key, "circuit"), width="content")
+    else:
+        fig = qc.draw(output='mpl', style={'fontsize': 10, 'linecolor': '#555'}, scale=0.5)
+        expander1.pyplot(fig, width="content")
+        plt.close(fig)
 
     backend = Aer.get_backend("aer_simulator")
     result = backend.run(qc, shots=1024).result()
     counts = result.get_counts()
 
     expander2 = st.expander("See Histogram")
-    expander2.pyplot(plot_histogram(counts), width="content")
+    expander2.pyplot(get_pool().histogram("correlation histogram", counts), width="content")
     total_shots = sum(counts.values())
 
-    qc1 = QuantumCircuit(2, 2)
-    qc1.x(1)
-    if 'Z' in basis:
-        state = Statevector.from_instruction(qc1)
-    elif 'X' in basis:
-        qc1.h([0, 1])
-        state = Statevector.from_instruction(qc1)
-    elif 'Y' in basis:
-        qc1.h([0, 1])
-        qc1.s([0, 1])
-        state = Statevector.from_instruction(qc1)
-
     expander3 = st.expander("See Bloch Spheres for chosen basis")
-    fig_bloch = plot_bloch_multivector(state, title=f"Basis vectors for {basis} basis")
-    expander3.pyplot(fig_bloch)
-    plt.close(fig_bloch)
+    if pack and f"correlation/{basis}" in pack:
+        expander3.image(pack.figure(f"correlation/{basis}", "bloch"))
+    else:
+        state = Statevector.from_instruction(basis_circuit(basis))
+        expander3.pyplot(get_pool().bloch("correlation bloch", state, title=f"Basis vectors for {basis} basis"))
 
     corr = (counts.get("00", 0) + counts.get("11", 0)
             - counts.get("01", 0) - counts.get("10", 0)) / total_shots
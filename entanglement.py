@@ -3,14 +3,13 @@ import streamlit as st
 from matplotlib import pyplot as plt
 from qiskit_aer import Aer
 from qiskit import QuantumCircuit
-from qiskit.visualization import plot_histogram, plot_bloch_multivector
 from qiskit.quantum_info import Statevector
+from prerender import get_pack
+from fragments import timed_fragment
+from figure_pool import get_pool
 
 
-def reset_circuit(n=2):
-    st.session_state.alice_ops = []
-    st.session_state.init = 0
-
+def entangled_circuit(n=2):
     qc = QuantumCircuit(n, n)
     qc.name = "Quantum State"
 
@@ -20,7 +19,14 @@ def reset_circuit(n=2):
         qc.cx(1, 2)
 
     qc.barrier()
+    return qc
+
+
+def reset_circuit(n=2):
+    st.session_state.alice_ops = []
+    st.session_state.init = 0
 
+    qc = entangled_circuit(n)
     st.session_state.qubits = qc
     st.session_state.statevector = Statevector.from_instruction(qc)
 
@@ -41,7 +47,7 @@ def run_qasm_simulation(n=2):
     result = simulator.run(qc_final, shots=shots).result()
     counts = result.get_counts()
     q = 'q₂q₁q₀' if n == 3 else 'q₁q₀'
-    fig_hist = plot_histogram(counts, title=f"Measurement Result ({q})")
+    fig_hist = get_pool().histogram("entanglement histogram", counts, title=f"Measurement Result ({q})")
 
     placeholder = st.empty()
     msg = f"Waiting for Bob{' and Charlie' if n == 3 else ''} to measure..."
@@ -69,9 +75,12 @@ def plot_bloch(n):
 
                 That’s the essence of **entanglement**; local randomness, global order.
                 """)
-                fig_bloch = plot_bloch_multivector(st.session_state.statevector)
-                st.pyplot(fig_bloch)
-                plt.close(fig_bloch)
+                # the statevector is captured when the circuit is reset, before Alice's operations
+                pack = get_pack()
+                if pack and f"entangle/{n}/" in pack:
+                    st.image(pack.figure(f"entangle/{n}/", "bloch"), width="stretch")
+                else:
+                    st.pyplot(get_pool().bloch("entanglement bloch", st.session_state.statevector))
             except Exception as e:
                 st.warning(f"⚠️ Could not plot Bloch sphere: {e}")
 
@@ -96,8 +105,32 @@ def entangle(n):
     """)
 
 
+    lab(n)
+    # st.markdown("---")
+
+
+@timed_fragment("entanglement lab")
+def lab(n):
+    # Run and Reset change the circuit, the histogram and the Bloch view together, so they share this fragment.
+    gate_controls(n)
+
+    col_b1, col_b2 = st.columns(2)
+    if col_b2.button("Reset Circuit", on_click=reset_circuit, args=[n], icon="🔄", use_container_width=True):
+        st.success(f"Circuit reset to {'Bell' if n == 2 else 'GHZ'} State.")
+
+    if col_b1.button("Run Simulation ▶️", use_container_width=True):
+
+        run_qasm_simulation(n)
+
+    plot_bloch(n)
+
+
+@timed_fragment("entanglement gates")
+def gate_controls(n):
+    desc = "Bob's" if n == 2 else "Bob and Charlie's"
     # st.markdown(f"Hey Alice! Choose your quantum operations before {desc}.")
     qc = st.session_state.qubits
+    after_run = st.session_state.get("init", False)
     col_h, col_x, col_z = st.columns(3)
     if col_h.button("H (Hadamard)", type="primary", use_container_width=True):
         qc.h(0)
@@ -111,6 +144,9 @@ def entangle(n):
         qc.z(0)
         st.session_state.alice_ops.append("Z")
         if st.session_state.get("init", False): reset_circuit(n)
+    if after_run and not st.session_state.get("init", False):
+        # The first gate after a simulation brings back the Bloch view, which lives in the outer fragment.
+        st.rerun()
     with st.expander("Gate Reference"):
         st.markdown(f"""
         - **Hadamard (H):** Puts the qubit into **superposition**, enabling quantum interference.  
@@ -125,21 +161,15 @@ def entangle(n):
     expander = st.expander("See Circuit")
     if st.session_state.qubits is not None:
         try:
-            fig = st.session_state.qubits.draw(output='mpl', style={'fontsize': 10, 'linecolor': '#555'}, scale=0.5)
-            expander.pyplot(fig, width="content")
-            plt.close(fig)
+            pack = get_pack()
+            key = f"entangle/{n}/{''.join(st.session_state.alice_ops)}"
+            if pack and not st.session_state.get("init", False) and key in pack:
+                expander.image(pack.figure(key, "circuit"), width="content")
+            else:
+                fig = st.session_state.qubits.draw(output='mpl', style={'fontsize': 10, 'linecolor': '#555'}, scale=0.5)
+                expander.pyplot(fig, width="content")
+                plt.close(fig)
         except Exception as e:
             st.warning(f"⚠️ Could not draw circuit: {e}")
     else:
         reset_circuit(n)
-
-    col_b1, col_b2 = st.columns(2)
-    if col_b2.button("Reset Circuit", on_click=reset_circuit, args=[n], icon="🔄", use_container_width=True):
-        st.success(f"Circuit reset to {'Bell' if n == 2 else 'GHZ'} State.")
-
-    if col_b1.button("Run Simulation ▶️", use_container_width=True):
-
-        run_qasm_simulation(n)
-
-    plot_bloch(n)
-    # st.markdown("---")
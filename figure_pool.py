@@ -0,0 +1,180 @@
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import streamlit as st
+from matplotlib.figure import Figure, figaspect
+from matplotlib.ticker import MaxNLocator
+from qiskit.quantum_info import DensityMatrix, partial_trace
+from qiskit.visualization import plot_bloch_vector
+from qiskit.visualization.bloch import Arrow3D
+
+POOL_SIZE = 8
+
+# Every figure the pools have built and not yet released, across all sessions. Each session's script
+# thread updates it, so access goes through the lock.
+_live_figures = weakref.WeakSet()
+_live_figures_lock = threading.Lock()
+
+
+def bloch_vectors(state):
+    num = state.num_qubits
+    vectors = []
+    for i in range(num):
+        others = [q for q in range(num) if q != i]
+        rho = partial_trace(state, others).data if others else DensityMatrix(state).data
+        vectors.append([2 * rho[0, 1].real, 2 * rho[1, 0].imag, (rho[0, 0] - rho[1, 1]).real])
+    return vectors
+
+
+class _Slot:
+    def __init__(self, kind, layout, fig):
+        self.kind = kind
+        self.layout = layout
+        self.fig = fig
+        self.artists = {}
+
+
+class FigurePool:
+    """Keeps one figure per named slot and redraws only the artists that changed between reruns.
+
+    Figures are built with ``matplotlib.figure.Figure`` rather than pyplot, so they never enter the
+    global pyplot registry; evicted or abandoned figures are reclaimed by the garbage collector.
+    """
+
+    def __init__(self, size=POOL_SIZE):
+        self.size = size
+        self._slots = OrderedDict()
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _take(self, name, kind, layout):
+        slot = self._slots.get(name)
+        if slot is not None:
+            self._slots.move_to_end(name)
+            if slot.kind == kind and slot.layout == layout:
+                return slot, True
+            slot.fig.clear()
+            slot.kind, slot.layout, slot.artists = kind, layout, {}
+            return slot, False
+
+        slot = _Slot(kind, layout, Figure())
+        with _live_figures_lock:
+            _live_figures.add(slot.fig)
+        self._slots[name] = slot
+        while len(self._slots) > self.size:
+            _, evicted = self._slots.popitem(last=False)
+            self._release(evicted)
+        return slot, False
+
+    @staticmethod
+    def _release(slot):
+        slot.fig.clear()
+        with _live_figures_lock:
+            _live_figures.discard(slot.fig)
+
+    def release(self):
+        for slot in self._slots.values():
+            self._release(slot)
+        self._slots.clear()
+
+    def histogram(self, name, counts, title=None):
+        # Mirrors the look of qiskit's plot_histogram, which cannot draw into a pooled figure cleanly.
+        labels = tuple(sorted(counts))
+        values = [counts[label] for label in labels]
+        slot, reuse = self._take(name, "histogram", labels)
+        fig = slot.fig
+
+        if reuse:
+            ax = slot.artists["ax"]
+            for rect, text, value in zip(slot.artists["bars"], slot.artists["texts"], values):
+                rect.set_height(value)
+                text.set_position((rect.get_x() + rect.get_width() / 2.0, 1.05 * value))
+                text.set_text(str(value))
+        else:
+            fig.set_size_inches(7, 5)
+            ax = fig.add_subplot()
+            bars = ax.bar(range(len(labels)), values, 0.5, color="C0", zorder=2)
+            texts = [ax.text(rect.get_x() + rect.get_width() / 2.0, 1.05 * value, str(value),
+                             ha="center", va="bottom", zorder=3)
+                     for rect, value in zip(bars, values)]
+            ax.set_xticks(range(len(labels)))
+            ax.set_xticklabels(labels, rotation=70, ha="right", rotation_mode="anchor")
+            ax.set_ylabel("Count", fontsize=14)
+            ax.yaxis.set_major_locator(MaxNLocator(5))
+            ax.grid(which="major", axis="y", zorder=0, linestyle="--")
+            slot.artists = {"ax": ax, "bars": bars, "texts": texts}
+
+        ax.set_ylim([0.0, min(1.1 * sum(values), max(1.1 * value for value in values))])
+        ax.set_title(title or "")
+        fig.tight_layout()
+        return fig
+
+    def bloch(self, name, state, title=""):
+        vectors = bloch_vectors(state)
+        slot, reuse = self._take(name, "bloch", (len(vectors), bool(title)))
+        fig = slot.fig
+
+        if reuse:
+            # Only the arrows move; the spheres, axes and labels are left as they were drawn.
+            for arrow, vector in zip(slot.artists["arrows"], vectors):
+                arrow.set_3d_properties(((0, 0), (vector[1], -vector[0])), (0, vector[2]), "z")
+        else:
+            width, height = figaspect(1 / len(vectors))
+            if title:
+                height += 1 + 1 / 100
+            fig.set_size_inches(width, height)
+            arrows = []
+            for i, vector in enumerate(vectors):
+                ax = fig.add_subplot(1, len(vectors), i + 1, projection="3d")
+                plot_bloch_vector(vector, "qubit " + str(i), ax=ax)
+                arrows += [child for child in ax.get_children() if isinstance(child, Arrow3D)]
+            slot.artists = {"arrows": arrows}
+
+        fig.suptitle(title, fontsize=16, y=0.98)
+        if not reuse:
+            fig.tight_layout()
+        return fig
+
+
+def get_pool():
+    # One pool per browser session; release_pool() frees it before the session state is cleared.
+    if "figure_pool" not in st.session_state:
+        st.session_state.figure_pool = FigurePool()
+    return st.session_state.figure_pool
+
+
+def release_pool():
+    if "figure_pool" in st.session_state:
+        st.session_state.figure_pool.release()
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def figure_stats():
+    from matplotlib import pyplot as plt
+
+    with _live_figures_lock:
+        live = len(_live_figures)
+    return {
+        "pooled figures (all sessions)": live,
+        "pooled figures (this session)": len(get_pool()),
+        "unclosed pyplot figures": len(plt.get_fignums()),
+        "process memory (MB)": _rss_mb(),
+    }
+
+
+def show_figure_stats(container=st):
+    stats = figure_stats()
+    container.table({"": list(stats), "value": [
+        "n/a" if value is None else f"{value:.1f}" if isinstance(value, float) else str(value)
+        for value in stats.values()
+    ]})
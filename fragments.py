@@ -0,0 +1,46 @@
+from functools import wraps
+from time import perf_counter
+
+import streamlit as st
+from streamlit.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def timings_requested():
+    return "timings" in st.query_params
+
+
+def record_timing(name, seconds):
+    st.session_state.setdefault("rerun_timings", {})[name] = seconds
+    logger.info("rerun %s took %.1f ms", name, seconds * 1000)
+
+
+def timed_fragment(name):
+    """Run ``func`` as an ``st.fragment`` so its widgets only rerun this block, recording its duration."""
+
+    def decorator(func):
+        @st.fragment
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                record_timing(name, elapsed)
+            # Drawn inside the fragment, so it is refreshed by the fragment's own reruns.
+            if timings_requested():
+                st.caption(f"⏱️ {name}: {elapsed * 1000:.1f} ms")
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def show_timings(container=st):
+    # The sidebar is drawn before the page body, so this is the total of the previous full rerun.
+    seconds = st.session_state.get("rerun_timings", {}).get("page")
+    if seconds is not None:
+        container.table({"block": ["page"], "ms": [f"{seconds * 1000:.1f}"]})
@@ -0,0 +1,201 @@
+import argparse
+import hashlib
+import json
+import mmap
+import shutil
+from io import BytesIO
+from itertools import product
+from pathlib import Path
+
+import matplotlib
+import numpy as np
+import qiskit
+import streamlit as st
+from matplotlib import pyplot as plt
+from qiskit.quantum_info import Statevector
+from qiskit.visualization import plot_bloch_multivector
+
+PACK_VERSION = 2
+PACK_DIR = Path(__file__).resolve().parent / "prerender_pack"
+ENTANGLE_DEPTH = 4
+
+BELL_STATES = ["Φ⁺", "Φ⁻", "Ψ⁺", "Ψ⁻"]
+BASES = ["Z", "X", "Y"]
+ALICE_GATES = ["H", "X", "Z"]
+
+CIRCUIT_STYLE = {'fontsize': 10, 'linecolor': '#555'}
+
+
+def versions():
+    return {
+        "pack": PACK_VERSION,
+        "qiskit": qiskit.__version__,
+        "matplotlib": matplotlib.__version__,
+    }
+
+
+class PrerenderPack:
+    """Read-only view over a pack directory; arrays and figures stay memory-mapped."""
+
+    def __init__(self, manifest, statevectors, figures):
+        self.manifest = manifest
+        self._entries = manifest["entries"]
+        self._statevectors = statevectors
+        self._figures = figures
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def statevector(self, key):
+        start, stop = self._entries[key]["amplitudes"]
+        return Statevector(np.array(self._statevectors[start:stop]))
+
+    def figure(self, key, name):
+        offset, length = self._entries[key]["figures"][name]
+        return self._figures[offset:offset + length]
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def figure_png(fig):
+    buf = BytesIO()
+    fig.savefig(buf, format="png", dpi=200, bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+
+def circuit_png(qc):
+    return figure_png(qc.draw(output='mpl', style=CIRCUIT_STYLE, scale=0.5))
+
+
+def _pack_entries(depth=ENTANGLE_DEPTH):
+    # Deferred so the demo modules can import get_pack from here without a cycle.
+    from coin_game import coin_circuit
+    from correlation import correlation_circuit, basis_circuit
+    from entanglement import entangled_circuit
+
+    for bell_state, basis in product(BELL_STATES, BASES):
+        qc = correlation_circuit(bell_state, basis)
+        state = Statevector.from_instruction(qc)
+        qc.measure([0, 1], [0, 1])
+        yield f"correlation/{bell_state}/{basis}", state, {"circuit": circuit_png(qc)}
+
+    # Only the correlation page reads statevectors from the pack; everything else is served as figures.
+    for basis in BASES:
+        state = Statevector.from_instruction(basis_circuit(basis))
+        fig = plot_bloch_multivector(state, title=f"Basis vectors for {basis} basis")
+        yield f"correlation/{basis}", None, {"bloch": figure_png(fig)}
+
+    for step in range(101):
+        prob = step / 100
+        state = Statevector.from_instruction(coin_circuit(prob))
+        fig = plot_bloch_multivector(state, title='Bloch Sphere')
+        yield f"coin/{prob:.2f}", None, {"bloch": figure_png(fig)}
+
+    for n in (2, 3):
+        for length in range(depth + 1):
+            for ops in product(ALICE_GATES, repeat=length):
+                qc = entangled_circuit(n)
+                for op in ops:
+                    getattr(qc, op.lower())(0)
+                figures = {"circuit": circuit_png(qc)}
+                if not ops:
+                    # The lab's Bloch view shows the state captured at reset, before any of Alice's gates.
+                    figures["bloch"] = figure_png(plot_bloch_multivector(Statevector.from_instruction(qc)))
+                yield f"entangle/{n}/{''.join(ops)}", None, figures
+
+
+def build_pack(path=PACK_DIR, depth=ENTANGLE_DEPTH):
+    path = Path(path)
+    staging = path.with_name(path.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    entries = {}
+    amplitudes = []
+    offset = 0
+    size = 0
+    with open(staging / "figures.bin", "wb") as blob:
+        for key, state, figures in _pack_entries(depth):
+            entries[key] = {"figures": {}}
+            if state is not None:
+                entries[key]["amplitudes"] = [size, size + len(state.data)]
+                amplitudes.append(state.data)
+                size += len(state.data)
+            for name, png in figures.items():
+                blob.write(png)
+                entries[key]["figures"][name] = [offset, len(png)]
+                offset += len(png)
+
+    amplitudes = np.concatenate(amplitudes).astype(np.complex128)
+    np.save(staging / "statevectors.npy", amplitudes)
+
+    files = ["statevectors.npy", "figures.bin"]
+    manifest = {
+        "versions": versions(),
+        "depth": depth,
+        "files": {name: _sha256(staging / name) for name in files},
+        "entries": entries,
+    }
+    # The manifest is written last so a half-built pack never looks complete.
+    with open(staging / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+    shutil.rmtree(path, ignore_errors=True)
+    staging.rename(path)
+    return manifest
+
+
+def load_pack(path=PACK_DIR):
+    path = Path(path)
+    try:
+        with open(path / "manifest.json", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get("versions") != versions():
+        return None
+    for name, digest in manifest["files"].items():
+        if not (path / name).is_file() or _sha256(path / name) != digest:
+            return None
+
+    statevectors = np.load(path / "statevectors.npy", mmap_mode="r")
+    with open(path / "figures.bin", "rb") as f:
+        figures = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return PrerenderPack(manifest, statevectors, figures)
+
+
+@st.cache_resource(show_spinner=False)
+def get_pack():
+    return load_pack()
+
+
+def show_figure(fig, container=st, width="stretch"):
+    if isinstance(fig, (bytes, bytearray)):
+        container.image(fig, width=width)
+    else:
+        container.pyplot(fig, width=width)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prerender the Quantum Playground demo spaces.")
+    parser.add_argument("--out", default=PACK_DIR, help="pack directory (default: %(default)s)")
+    parser.add_argument("--depth", type=int, default=ENTANGLE_DEPTH,
+                        help="longest H/X/Z sequence to prerender for the Entanglement Lab")
+    parser.add_argument("--check", action="store_true", help="only verify an existing pack")
+    args = parser.parse_args()
+
+    if args.check:
+        pack = load_pack(args.out)
+        print("pack is valid" if pack else "pack is missing, stale or corrupt")
+        raise SystemExit(0 if pack else 1)
+
+    manifest = build_pack(args.out, args.depth)
+    print(f"prerendered {len(manifest['entries'])} entries into {args.out}")
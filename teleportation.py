@@ -1,17 +1,108 @@
+import numpy as np
 import streamlit as st
-from qiskit import QuantumCircuit
+from qiskit import QuantumCircuit, transpile
+from qiskit.circuit import Parameter
 from qiskit_aer import StatevectorSimulator, Aer
-from qiskit.quantum_info import Statevector
-from qiskit.visualization import plot_histogram, plot_bloch_multivector
-import matplotlib.pyplot as plt
-from math import pi
+from qiskit.quantum_info import Operator, Statevector
+from math import pi, cos, sin
+from fragments import timed_fragment
+from figure_pool import get_pool
+from prerender import circuit_png
+
+THETA = Parameter("θ")
+PHI = Parameter("φ")
+LAMBDA = Parameter("λ")
+
+
+def protocol_stages():
+    # One prefix of the protocol per stage, with Alice's rotation left symbolic.
+    qc = QuantumCircuit(3, 3)
+    qc.u(THETA, PHI, LAMBDA, 0)
+    qc.barrier()
+    stages = {1: qc.copy()}
+
+    qc.h(1)
+    qc.cx(1, 2)
+    qc.barrier()
+    stages[2] = qc.copy()
+
+    qc.cx(0, 1)
+    qc.h(0)
+    qc.barrier()
+    stages[3] = qc.copy()
+
+    qc.measure([0, 1], [0, 1])
+    qc.barrier()
+    stages[4] = qc.copy()
+
+    with qc.if_test((0, 1)):
+        qc.z(2)
+    with qc.if_test((1, 1)):
+        qc.x(2)
+    qc.barrier()
+    stages[5] = qc.copy()
+
+    qc.u(THETA, PHI, LAMBDA, 2).inverse()
+    qc.measure(2, 2)
+    qc.barrier()
+    stages[6] = qc
+    return stages
+
+
+@st.cache_resource(show_spinner=False)
+def compiled_protocol():
+    # Built and transpiled once per server; reruns only bind (θ, φ, λ) into it.
+    stages = protocol_stages()
+    sampler = Aer.get_backend('aer_simulator')
+
+    # Before any measurement the protocol is unitary: the state is a fixed 8x8 operator applied to U(θ, φ, λ)|0⟩.
+    unitary_tail = {}
+    for stage in (1, 2, 3):
+        tail = QuantumCircuit(3)
+        for instruction in stages[stage].data[1:]:
+            if instruction.operation.name != "barrier":
+                tail.append(instruction.operation, [stages[stage].find_bit(q).index for q in instruction.qubits])
+        unitary_tail[stage] = Operator(tail)
+
+    return {
+        "stages": stages,
+        "unitary_tail": unitary_tail,
+        # StatevectorSimulator runs if_test blocks but does not advertise them to the transpiler,
+        # so both backends share the circuits compiled for the sampler.
+        "compiled": {stage: transpile(stages[stage], sampler) for stage in (4, 5, 6)},
+        "backends": {"sampler": sampler, "statevector": StatevectorSimulator()},
+    }
+
+
+@st.cache_data(show_spinner=False)
+def stage_diagram(stage):
+    return circuit_png(compiled_protocol()["stages"][stage])
+
+
+def bound_parameters():
+    return {THETA: st.session_state.theta, PHI: st.session_state.phi, LAMBDA: st.session_state.lamb}
+
+
+def stage_statevector(stage):
+    theta, phi = st.session_state.theta, st.session_state.phi
+    # U(θ, φ, λ)|0⟩ = cos(θ/2)|0⟩ + e^{iφ} sin(θ/2)|1⟩ on q₀, with q₁ and q₂ still in |0⟩; λ only acts on |1⟩.
+    data = np.zeros(8, dtype=complex)
+    data[0] = cos(theta / 2)
+    data[1] = np.exp(1j * phi) * sin(theta / 2)
+    return Statevector(data).evolve(compiled_protocol()["unitary_tail"][stage])
+
+
+def run_stage(stage, backend, **options):
+    protocol = compiled_protocol()
+    circuit = protocol["compiled"][stage].assign_parameters(bound_parameters())
+    return protocol["backends"][backend].run(circuit, **options).result()
+
 
 def initialize_state():
     st.session_state.theta = 0.0
     st.session_state.phi = 0.0
     st.session_state.lamb = 0.0
     st.session_state.stage = 1
-    st.session_state.teleport_circuit = QuantumCircuit(3, 3)
     st.session_state.original_state = None
     st.session_state.final_state = None
 
@@ -21,7 +112,6 @@ def advance_stage():
 
 
 def step1_ui():
-    qc = st.session_state.teleport_circuit
     st.subheader("Step 1️⃣ — Encode Alice's Hidden message(q₀) using the following parameters")
     st.markdown("""
     In this step, Alice prepares her **secret qubit** |ψ⟩ using rotations. The parameters (θ, φ) define a point on the **Bloch sphere**, representing the qubit’s state
@@ -29,6 +119,15 @@ def step1_ui():
     st.latex(r'''
         |\psi\rangle = \cos\left(\frac{\theta}{2}\right)|0\rangle + e^{i\varphi}\sin\left(\frac{\theta}{2}\right)|1\rangle
     ''')
+    encode_controls()
+
+    st.button("Next: Entanglement ▶️", on_click=advance_stage)
+
+
+@timed_fragment("teleportation encoding")
+def encode_controls():
+    # Streamlit debounces slider drags and abandons a rerun as soon as a newer value arrives, so only the
+    # latest (θ, φ) runs to completion; each run is a closed-form update and an in-place Bloch redraw.
     theta = st.slider("`θ` (rotation around Y-axis ranging from 0 to π)", min_value=0.0, max_value=pi, step=0.001, value=0.0)
     phi = st.slider("`φ` (phase around Z-axis ranging from 0 to 2π)", min_value=0.0, max_value=2*pi, step=0.001, value=0.0)
     # lamb = st.slider("`λ` (Added phase lambda ranging from 0 to 2π)", min_value=0.0, max_value=2*pi, step=0.001, value=0.0)
@@ -37,17 +136,10 @@ def step1_ui():
     st.session_state.phi = phi
     st.session_state.lamb = lamb
 
-    qc.data.clear()
-    qc.u(theta, phi, lamb, 0)
-    qc.barrier()
-
-    show_circuit_and_bloch(qc, Statevector.from_instruction(qc))
-
-    st.button("Next: Entanglement ▶️", on_click=advance_stage)
+    show_circuit_and_bloch(1, stage_statevector(1))
 
 
 def step2_ui():
-    qc = st.session_state.teleport_circuit
     st.subheader("Step 2️⃣ 👩 — Alice's Qubit is entangled with Bob's")
     st.markdown("""
     Now, Alice and Bob share an **entangled pair** (q₁ and q₂).<br/>
@@ -57,16 +149,12 @@ def step2_ui():
 
     The result is a **Bell state**, meaning measuring one instantly defines the other. This shared entanglement acts like a **quantum bridge** between Alice and Bob.
     """, unsafe_allow_html=True)
-    qc.h(1)
-    qc.cx(1, 2)
-    qc.barrier()
-    st.session_state.original_state = Statevector.from_instruction(qc)
-    show_circuit_and_bloch(qc, st.session_state.original_state)
+    st.session_state.original_state = stage_statevector(2)
+    show_circuit_and_bloch(2, st.session_state.original_state)
     st.button("Next: Bell Measurement ▶️", on_click=advance_stage)
 
 
 def step3_ui():
-    qc = st.session_state.teleport_circuit
     st.subheader("Step 3️⃣ 👩 — Alice Entangles Her Qubit with the Shared Pair")
     st.markdown("""
     Alice now entangles her **message qubit (q₀)** with her part of the **entangled pair (q₁)** using:
@@ -75,11 +163,8 @@ def step3_ui():
     After this, the 3-qubit system holds all information needed for teleportation.<br/>
     But the message itself is now **distributed** across the system; no single qubit “has” it anymore.
     """, unsafe_allow_html=True)
-    qc.cx(0, 1)
-    qc.h(0)
-    qc.barrier()
-    st.session_state.state_after_entangle = Statevector.from_instruction(qc)
-    show_circuit_and_bloch(qc, st.session_state.state_after_entangle)
+    st.session_state.state_after_entangle = stage_statevector(3)
+    show_circuit_and_bloch(3, st.session_state.state_after_entangle)
     st.button("Next: Alice Measures ▶️", on_click=advance_stage)
 
 
@@ -92,15 +177,9 @@ def step4_ui():
     We apply measurement through 1024 shots and send these classical bit measurements to Bob as well. 
     """, unsafe_allow_html=True)
 
-    qc = st.session_state.teleport_circuit
-    qc.measure([0, 1], [0, 1])
-    qc.barrier()
-
-    backend = Aer.get_backend('aer_simulator')
-    result = backend.run(qc, shots=1024).result()
-    counts = result.get_counts()
-    st.pyplot(plot_histogram(counts))
-    show_circuit_and_bloch(qc)
+    counts = run_stage(4, "sampler", shots=1024).get_counts()
+    st.pyplot(get_pool().histogram("teleportation histogram", counts))
+    show_circuit_and_bloch(4)
 
     st.button("Next: Bob's Corrections ▶️", on_click=advance_stage)
 
@@ -122,29 +201,16 @@ def step5_ui():
 
     `Notice:` no quantum particle traveled, only two classical bits were sent.
     """, unsafe_allow_html=True)
-    qc = st.session_state.teleport_circuit
-
-    with qc.if_test((0, 1)):
-        qc.z(2)
-    with qc.if_test((1, 1)):
-        qc.x(2)
-    qc.barrier()
-
-    backend = StatevectorSimulator()
-    st.session_state.final_state = backend.run(qc, shots=1).result().get_statevector()  # set shots = 1
+    st.session_state.final_state = run_stage(5, "statevector", shots=1).get_statevector()  # set shots = 1
 
     st.markdown("#### Alice's Original State")
-    fig1 = plot_bloch_multivector(st.session_state.original_state)
-    st.pyplot(fig1)
-    plt.close(fig1)
+    st.pyplot(get_pool().bloch("teleportation original", st.session_state.original_state))
 
     # with col2:
     st.markdown("#### Bob's Reconstructed State")
-    fig2 = plot_bloch_multivector(st.session_state.final_state)
-    st.pyplot(fig2)
-    plt.close(fig2)
+    st.pyplot(get_pool().bloch("teleportation final", st.session_state.final_state))
     st.success("✅ Bob’s final qubit (q₂) matches Alice’s original qubit (q₀)!")
-    show_circuit_and_bloch(qc)
+    show_circuit_and_bloch(5)
     st.button("Next: Inverse Measurement ▶️", on_click=advance_stage)
 
 
@@ -156,24 +222,15 @@ def step6_ui():
 
     This demonstrates the **fidelity of quantum teleportation**, the original state was perfectly transferred using entanglement and classical communication.
     """)
-    qc = st.session_state.teleport_circuit
-
-    qc.u(st.session_state.theta, st.session_state.phi, st.session_state.lamb, 2).inverse()
-    qc.measure(2, 2)
-    qc.barrier()
-
-    backend = StatevectorSimulator()
-    final = backend.run(qc, shots=1).result().get_statevector()  # set shots = 1
+    final = run_stage(6, "statevector", shots=1).get_statevector()  # set shots = 1
 
-    backend = Aer.get_backend('aer_simulator')
-    result = backend.run(qc, shots=1024).result()
-    counts = result.get_counts()
-    st.pyplot(plot_histogram(counts))
+    counts = run_stage(6, "sampler", shots=1024).get_counts()
+    st.pyplot(get_pool().histogram("teleportation histogram", counts))
     # fig2 = plot_bloch_multivector(final)
     # st.pyplot(fig2)
     # plt.close(fig2)
     # st.success("✅ Bob’s final qubit (q₂) matches Alice’s original qubit (q₀)!")
-    show_circuit_and_bloch(qc, final)
+    show_circuit_and_bloch(6, final)
     st.success("Verified!")
 
 
@@ -186,6 +243,12 @@ def teleportation():
 
     # st.divider()
 
+    stage_ui()
+
+
+@timed_fragment("teleportation stage")
+def stage_ui():
+    # The "Next" buttons only advance the stage, so only this block needs to rerun for them.
     if st.session_state.stage == 1:
         step1_ui()
     elif st.session_state.stage == 2:
@@ -200,20 +263,17 @@ def teleportation():
         step6_ui()
 
 
-def show_circuit_and_bloch(qc, statevector=None):
+def show_circuit_and_bloch(stage, statevector=None):
     # st.markdown("---")
     if statevector is not None:
         expander = st.expander("See Bloch Sphere", expanded=True)
         expander.subheader("⚡ Bloch Spheres")
         expander.markdown("**Bloch Sphere Visualization**")
         try:
-            fig2 = plot_bloch_multivector(statevector)
-            expander.pyplot(fig2)
-            plt.close(fig2)
+            expander.pyplot(get_pool().bloch("teleportation bloch", statevector))
         except Exception as e:
             expander.warning(f"Could not show Bloch sphere: {e}")
     expander1 = st.expander("See Circuit")
     expander1.subheader("⚡ Quantum Circuit Diagram")
-    fig = qc.draw(output='mpl', style={'fontsize': 10, 'linecolor': '#555'}, scale=0.5)
-    expander1.pyplot(fig, width='content')
-    plt.close(fig)
+    # The diagram shows the symbolic template, so it is drawn once per stage rather than on every slider tick.
+    expander1.image(stage_diagram(stage), width='content')